@@ -25,13 +25,27 @@
 
 # Thermostat.py (entry point)
 
-from time import sleep
-from gpiozero import Button
+import signal
+from threading import Thread, Event
 
-from thermostat.config import ThermostatConfig
-from thermostat.hal.rpi_hal import RpiHAL
+from thermostat.config import CFG
 from thermostat.controller import ThermostatController
 
+# Button event loop (runs on a single daemon thread).
+# 
+#     The HAL's button handle waits on all button pins at once, so one thread
+#     dispatches every press. The bounded wait lets the loop observe stop_evt
+#     during shutdown.
+# 
+#     Args:
+#         buttons: Handle returned by hal.setup_buttons().
+#         handlers: Mapping of BCM pin -> zero-argument controller command.
+#         stop_evt: Event signalling the loop to exit.
+def button_loop(buttons, handlers, stop_evt):
+    while not stop_evt.is_set():
+        for pin in buttons.wait_event(1.0):
+            handlers[pin]()
+
 # Application bootstrap.
 # 
 #     Responsibilities:
@@ -41,49 +55,66 @@ from thermostat.controller import ThermostatController
 #     4) Keep the process alive until interrupted, then perform a clean shutdown.
 # 
 #     Notes:
-#     - GPIO button callbacks run in gpiozero-managed background threads.
+#     - GPIO button commands run on one libgpiod event thread (see button_loop).
+#     - The main thread blocks on an Event (no periodic wakeups); SIGINT sets it.
 #     - Controller.stop() should be idempotent and safe to call once on exit.
 def main():
     # Centralized configuration keeps pins, timing, and thresholds out of logic.
-    cfg = ThermostatConfig()
+    # The frozen default instance is built once at import time and shared.
+    cfg = CFG
 
     # Hardware adapter for Raspberry Pi. All sensor/LED/LCD/UART operations live behind this layer.
+    # Imported here so button_loop can be reused (e.g. by the FakeHAL demo) without Pi libraries.
+    from thermostat.hal.rpi_hal import RpiHAL
     hal = RpiHAL(cfg)
 
     # Controller owns the thermostat state machine and high-level behavior.
     # `debug=True` enables operational logs helpful for bring-up on real hardware.
     controller = ThermostatController(hal, cfg, debug=True)
 
-    # Start any controller-managed background work (display loop, telemetry loop, etc.).
-    controller.start()
+    # Everything after the controller exists runs under try/finally, so a failure
+    # during bring-up (e.g. button line request) still stops the controller and
+    # releases the LEDs, UART and LCD pins.
+    stop_evt = Event()
+    button_thread = None
+    try:
+        # Start any controller-managed background work (display loop, telemetry loop, etc.).
+        controller.start()
 
-    # Ensure indicators immediately reflect current state and temperature.
-    # (Useful on boot to avoid "stale" LED state.)
-    controller.updateLights()
+        # Prime controller hot paths and ensure indicators immediately reflect current
+        # state and temperature. (Useful on boot to avoid "stale" LED state.)
+        controller.warmup()
 
-    # --- Physical Inputs (GPIO Buttons) ---
-    # Buttons are intentionally configured here (I/O wiring belongs at the boundary).
-    # The controller methods should remain hardware-agnostic, receiving no GPIO specifics.
-    greenButton = Button(cfg.BTN_STATE_PIN) # cycles thermostat mode: off -> heat -> cool -> off
-    redButton = Button(cfg.BTN_UP_PIN)      # increase setpoint
-    blueButton = Button(cfg.BTN_DOWN_PIN)   # decrease setpoint
+        # --- Physical Inputs (GPIO Buttons) ---
+        # Buttons are intentionally configured here (I/O wiring belongs at the boundary).
+        # The controller methods should remain hardware-agnostic, receiving no GPIO specifics.
+        handlers = {
+            cfg.BTN_STATE_PIN: controller.processTempStateButton, # cycles thermostat mode: off -> heat -> cool -> off
+            cfg.BTN_UP_PIN: controller.processTempIncButton,      # increase setpoint
+            cfg.BTN_DOWN_PIN: controller.processTempDecButton,    # decrease setpoint
+        }
 
-    # Bind button press events to controller actions.
-    # gpiozero triggers these in a background context; handler methods must be quick and thread-safe.
-    greenButton.when_pressed = controller.processTempStateButton
-    redButton.when_pressed = controller.processTempIncButton
-    blueButton.when_pressed = controller.processTempDecButton
+        # Configure every button pin in one pass; the HAL owns the GPIO details.
+        buttons = hal.setup_buttons(list(handlers))
 
-    # --- Main Loop ---
-    # Keep the process alive. Hardware interaction is managed by the controller/HAL.
-    # A minimal loop reduces overhead and ensures Ctrl+C is handled reliably.
-    try:
-        while True:
-            sleep(1)
-    except KeyboardInterrupt:
+        # --- Main Loop ---
+        # Keep the process alive. Hardware interaction is managed by the controller/HAL.
+        # The main thread blocks in the kernel until Ctrl+C (SIGINT) sets the stop event,
+        # so an idle thermostat causes no periodic interpreter wakeups.
+        signal.signal(signal.SIGINT, lambda *_: stop_evt.set())
+
+        # Button commands run on this thread; handler methods must be quick and thread-safe.
+        button_thread = Thread(target=button_loop, args=(buttons, handlers, stop_evt), daemon=True)
+        button_thread.start()
+
+        stop_evt.wait()
+    finally:
         # Graceful shutdown: stop background threads, release hardware resources, and exit.
         # The controller is responsible for HAL cleanup and stopping any worker threads.
         print("Cleaning up. Exiting...")
+        stop_evt.set()
+        if button_thread is not None:
+            button_thread.join(timeout=2.0)
         controller.stop()
 
 if __name__ == "__main__":
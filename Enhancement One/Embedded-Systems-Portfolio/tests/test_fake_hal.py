@@ -13,17 +13,24 @@
 # This is intentionally written as a runnable script (not a formal unit test)
 # to support step-by-step observation during development.
 
+from itertools import islice
+from threading import Thread, Event
 from time import sleep
 
+from Thermostat import button_loop
 from thermostat.config import ThermostatConfig
 from thermostat.hal.fake_hal import FakeHAL
 from thermostat.controller import ThermostatController
 
+# Time allowed for the button thread to dispatch an injected press.
+PRESS_SETTLE_SEC = 0.2
+
 # Run a simulated end-to-end thermostat session using FakeHAL.
 # 
 #     This function:
 #     - Injects a deterministic sequence of temperatures
-#     - Drives controller state changes manually
+#     - Drives controller state changes through simulated button presses
+#       (FakeButtons -> button_loop -> controller handlers, as wired in Thermostat.py)
 #     - Observes LED state, display output, and serial messages
 #     - Cleans up controller resources at the end
 # 
@@ -45,15 +52,27 @@ def run_fake_hal_demo():
     # Start the controller background thread (display + telemetry loop).
     controller.start()
 
+    # Wire the buttons exactly as the entry point does, but with a FakeButtons handle.
+    handlers = {
+        cfg.BTN_STATE_PIN: controller.processTempStateButton,
+        cfg.BTN_UP_PIN: controller.processTempIncButton,
+        cfg.BTN_DOWN_PIN: controller.processTempDecButton,
+    }
+    buttons = hal.setup_buttons(list(handlers))
+    stop_evt = Event()
+    button_thread = Thread(target=button_loop, args=(buttons, handlers, stop_evt), daemon=True)
+    button_thread.start()
+
     print("\n--- Initial State ---")
     # Controller should start in the OFF state by default.
-    print("State:", controller.current_state.id)
+    print("State:", controller.current_state_id)
     print("LED:", hal.led_state)
 
     # Simulate pressing the mode button once: off -> heat
-    controller.processTempStateButton()  # off -> heat
+    hal.buttons.press(cfg.BTN_STATE_PIN)  # off -> heat
+    sleep(PRESS_SETTLE_SEC)
     print("\n--- After switching to HEAT ---")
-    print("State:", controller.current_state.id)
+    print("State:", controller.current_state_id)
 
     # Allow time for background loop to update LEDs, display, and serial output.
     sleep(2)
@@ -61,15 +80,22 @@ def run_fake_hal_demo():
     # Inspect FakeHAL internal state to verify behavior.
     print("LED:", hal.led_state)
     print("Last display:", hal.last_display)
-    print("Serial messages:", hal.serial_out[:2])
+    print("Serial messages:", list(islice(hal.serial_out, 2)))
 
     # Increase the setpoint twice.
     # This forces the controller to re-evaluate heating demand.
-    controller.processTempIncButton()
-    controller.processTempIncButton()
+    hal.buttons.press(cfg.BTN_UP_PIN)
+    hal.buttons.press(cfg.BTN_UP_PIN)
+    sleep(PRESS_SETTLE_SEC)
     print("\n--- After increasing setpoint twice ---")
     print("SetPoint:", controller.setPoint)
 
+    # Decrease once: one press must yield exactly one step.
+    hal.buttons.press(cfg.BTN_DOWN_PIN)
+    sleep(PRESS_SETTLE_SEC)
+    print("\n--- After decreasing setpoint once ---")
+    print("SetPoint:", controller.setPoint)
+
     sleep(2)
 
     # LED and display should reflect the updated control logic.
@@ -77,9 +103,10 @@ def run_fake_hal_demo():
     print("Last display:", hal.last_display)
 
     # Simulate pressing the mode button again: heat -> cool
-    controller.processTempStateButton()
+    hal.buttons.press(cfg.BTN_STATE_PIN)
+    sleep(PRESS_SETTLE_SEC)
     print("\n--- After switching to COOL ---")
-    print("State:", controller.current_state.id)
+    print("State:", controller.current_state_id)
 
     sleep(2)
 
@@ -87,8 +114,10 @@ def run_fake_hal_demo():
     print("LED:", hal.led_state)
     print("Last display:", hal.last_display)
 
-    # Request a clean shutdown of the controller.
-    # This stops the background thread and closes the HAL.
+    # Request a clean shutdown: stop the button thread first (as the entry point
+    # does), then the controller, which stops its threads and closes the HAL.
+    stop_evt.set()
+    button_thread.join(timeout=2.0)
     controller.stop()
     print("\n--- Shutdown ---")
     print("HAL closed:", hal.closed)
@@ -32,6 +32,13 @@ class ThermostatConfig:
     BTN_UP_PIN: int = 12
     BTN_DOWN_PIN: int = 25
 
+    # GPIO character device path that exposes the pins above (used for button edge events).
+    GPIO_CHIP: str = "/dev/gpiochip0"
+
+    # Kernel debounce period for the button lines: a button must hold a level this
+    # long before its edge is reported, so one press yields one controller command.
+    BUTTON_DEBOUNCE_SEC: float = 0.03
+
     # ---------------------------
     # Temperature Behavior
     # ---------------------------
@@ -50,6 +57,10 @@ class ThermostatConfig:
     SERIAL_SEND_INTERVAL_SEC: int = 30
     LIGHT_REFRESH_EVERY_SEC: int = 10
 
+    # Maximum age of a cached sensor measurement before a new I2C read is triggered.
+    # Callers within this window (e.g. a button press and the display tick) share one reading.
+    SENSOR_CACHE_TTL_SEC: float = 0.5
+
     # ---------------------------
     # LED Animation Parameters
     # ---------------------------
@@ -67,4 +78,11 @@ class ThermostatConfig:
     # These values must align with the external system consuming the data.
     SERIAL_PORT: str = "/dev/ttyS0"
     SERIAL_BAUD: int = 115200
-    SERIAL_TIMEOUT: int = 1
+
+
+# Shared default configuration instance.
+# 
+#     The dataclass is frozen, so a single module-level instance can be reused safely
+#     instead of being rebuilt at every startup path. Construct ThermostatConfig()
+#     directly only when injecting non-default values (e.g. in tests).
+CFG = ThermostatConfig()
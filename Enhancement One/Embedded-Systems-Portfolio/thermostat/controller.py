@@ -5,28 +5,27 @@
 # - Applies control rules using sensor readings and a configurable setpoint
 # - Delegates all hardware access to a Hardware Abstraction Layer (HAL)
 # - Runs a background display/telemetry loop on a dedicated daemon thread
+# - Funnels all HAL output (LEDs, LCD, serial) through a single I/O worker thread
 # 
 # Key design principle:
 # - Keep business logic here; keep hardware-specific operations behind HAL methods.
 
-from statemachine import StateMachine, State
-from threading import Thread, Event
-from datetime import datetime
-from math import floor
-
-class ThermostatController(StateMachine):
-    # ---------------------------
-    # State Machine Declarations
-    # ---------------------------
-    # 'statemachine' library uses class-level State definitions to build the FSM.
-    off = State(initial=True)  # default startup state
-    heat = State()
-    cool = State()
-
-    # Single event that cycles states in a predictable order.
-    # This keeps UI/inputs simple: one "mode" button advances the mode.
-    cycle = (off.to(heat) | heat.to(cool) | cool.to(off))
+from threading import Thread, Event, RLock
+from queue import Queue
+from time import time, monotonic, strftime, localtime
+
+# LCD timestamp format (line 1), kept at module scope so it is defined once.
+_TIME_FMT = "%m/%d %H:%M:%S"
+
+# ---------------------------
+# State Machine Declarations
+# ---------------------------
+# Thermostat modes in the order the mode button cycles through them. The FSM is a
+# fixed three-state ring, so it is encoded directly as an index into this tuple
+# rather than through a state machine library: a transition is one add + modulo.
+_STATES = ("off", "heat", "cool")
 
+class ThermostatController:
     def __init__(self, hal, cfg, debug=False):
         # Initialize controller dependencies and runtime state.
         # 
@@ -35,7 +34,6 @@ class ThermostatController(StateMachine):
         #     cfg: Configuration object containing constants (timing, pin mappings, setpoint bounds, etc.).
         #     debug: Enables human-readable logging for bring-up and troubleshooting.
 
-        super().__init__()
         self.hal = hal      # hardware boundary (all I/O should flow through this dependency)
         self.cfg = cfg      # single source of truth for timing/threshold constants
         self.debug = debug  # low-overhead runtime tracing
@@ -43,36 +41,99 @@ class ThermostatController(StateMachine):
         # Setpoint lives in controller state because it is part of "business logic" not hardware state.
         self.setPoint = cfg.DEFAULT_SETPOINT
 
+        # Current FSM state as an index into _STATES (0 = "off", the startup state).
+        self._state_idx = 0
+
         # Thread coordination primitives:
         # - _stop allows clean shutdown without busy-waiting
         # - _thread holds the background loop thread handle
         self._stop = Event()
         self._thread = None
 
+        # Guards setPoint and FSM state, which are mutated from the button thread
+        # and read from the display loop. Re-entrant because button handlers call
+        # updateLights() while already holding it.
+        self._lock = RLock()
+
+        # Single-consumer HAL command queue. Producers (button thread, display loop)
+        # only enqueue; the I/O worker owns the LCD/LED/UART so bus transactions
+        # never overlap and button handlers return immediately.
+        self._cmdq = Queue()
+        self._io_thread = None
+
+        # Set when a queued display write fails, so the display loop re-sends the
+        # frame on its next tick instead of treating it as already on screen.
+        self._display_failed = Event()
+
+        # LED policy dispatch table indexed like _STATES (replaces an if/elif chain
+        # of string comparisons on every refresh).
+        self._led_actions = (self._lights_off, self._lights_heat, self._lights_cool)
+
+    # ---------- State machine ----------
+    # Identifier of the current FSM state ("off", "heat" or "cool").
+    @property
+    def current_state_id(self) -> str:
+        return _STATES[self._state_idx]
+
+    # Single event that cycles states in a predictable order: off -> heat -> cool -> off.
+    # This keeps UI/inputs simple: one "mode" button advances the mode.
+    def cycle(self):
+        self._state_idx = (self._state_idx + 1) % len(_STATES)
+
     # ---------- Button actions ----------
     # These are designed to be bound directly to GPIO event callbacks.
+    # Each runs under self._lock so mutations are never observed half-applied.
     def processTempStateButton(self):
         if self.debug: print("Cycling Temperature State")
 
-        # Advance the state machine: off -> heat -> cool -> off
-        self.cycle()
+        with self._lock:
+            # Advance the state machine: off -> heat -> cool -> off
+            self.cycle()
 
-        # Immediately update indicators so user sees feedback without delay.
-        self.updateLights()
+            # Immediately update indicators so user sees feedback without delay.
+            self.updateLights()
 
     def processTempIncButton(self):
         if self.debug: print("Increasing Set Point")
-        # Clamp setpoint to avoid runaway values and keep UI behavior predictable.
-        self.setPoint = min(self.setPoint + 1, self.cfg.MAX_SETPOINT)
-        self.updateLights()
+        with self._lock:
+            # Clamp setpoint to avoid runaway values and keep UI behavior predictable.
+            self.setPoint = min(self.setPoint + 1, self.cfg.MAX_SETPOINT)
+            self.updateLights()
 
     def processTempDecButton(self):
         if self.debug: print("Decreasing Set Point")
-        # Clamp setpoint to avoid invalid values below supported range.
-        self.setPoint = max(self.setPoint - 1, self.cfg.MIN_SETPOINT)
-        self.updateLights()
+        with self._lock:
+            # Clamp setpoint to avoid invalid values below supported range.
+            self.setPoint = max(self.setPoint - 1, self.cfg.MIN_SETPOINT)
+            self.updateLights()
 
     # ---------- Core helpers ----------
+    # Hand a HAL output command to the I/O worker.
+    # 
+    #     Args:
+    #         op: Bound HAL method (e.g. self.hal.display).
+    #         *args: Arguments forwarded to the method.
+    # 
+    #     When the worker is not running (before start() / after stop()) the call is
+    #     made directly so the controller stays usable without background threads.
+    def _submit(self, op, *args):
+        if self._io_thread is not None and self._io_thread.is_alive():
+            self._cmdq.put((op, args))
+        else:
+            self._run_io(op, args)
+
+    # Execute one HAL command, reporting (never raising) failures.
+    # 
+    #     HAL errors surface here rather than at the producer, so they are always
+    #     logged, and a failed display write is flagged back to the display loop.
+    def _run_io(self, op, args):
+        try:
+            op(*args)
+        except Exception as e:
+            print(f"[WARN] HAL {op.__name__} failed: {e}")
+            if op == self.hal.display:
+                self._display_failed.set()
+
     # Read temperature (Fahrenheit) from HAL with defensive fallback.
     # 
     #     Rationale:
@@ -97,55 +158,97 @@ class ThermostatController(StateMachine):
     #     This method is called:
     #     - Immediately on state/setpoint changes (button actions)
     #     - Periodically by the background loop to keep indicators fresh
-    def updateLights(self):
-        # Floor to reduce jitter around threshold boundaries (prevents rapid toggling near setpoint).
-        temp = floor(self.safe_temp_f())
+    # 
+    #     Args:
+    #         temp_f: Temperature already sampled by the caller this tick; read from
+    #                 the sensor when omitted.
+    def updateLights(self, temp_f=None):
+        # Held for the whole update so LED writes from the button thread and the
+        # display loop cannot interleave and leave a stale indicator behind.
+        with self._lock:
+            # Whole degrees reduce jitter around threshold boundaries (prevents rapid toggling near setpoint).
+            # Indoor Fahrenheit readings are positive, so int() truncation matches floor().
+            if temp_f is None:
+                temp_f = self.safe_temp_f()
+            temp = int(temp_f)
 
-        if self.debug:
-            # These prints make behavior traceable during live demos and troubleshooting.
-            print(f"State: {self.current_state.id}")
-            print(f"SetPoint: {self.setPoint}")
-            print(f"Temp: {temp}")
+            idx = self._state_idx
 
-        try:
-            # Off state: no heating/cooling indication.
-            if self.current_state.id == "off":
-                self.hal.leds_off()
-            
-            # Heat state: red indicator reflects whether heating is "required".
-            elif self.current_state.id == "heat":
-                if temp < self.setPoint:
-                    # Below setpoint: blink/fade indicates active heating demand.
-                    self.hal.red_blink(self.cfg.BLINK_ON, self.cfg.BLINK_OFF, self.cfg.FADE_IN, self.cfg.FADE_OUT)
-                else:
-                    # At/above setpoint: solid indicates target is satisfied.
-                    self.hal.red_solid()
-            
-            # Cool state: blue indicator reflects whether cooling is "required".
-            elif self.current_state.id == "cool":
-                if temp > self.setPoint:
-                    # Above setpoint: blink/fade indicates active cooling demand.
-                    self.hal.blue_blink(self.cfg.BLINK_ON, self.cfg.BLINK_OFF, self.cfg.FADE_IN, self.cfg.FADE_OUT)
-                else:
-                    # At/below setpoint: solid indicates target is satisfied.
-                    self.hal.blue_solid()
-        except Exception as e:
-            # LED failures should not crash the control loop (GPIO permission, hardware disconnect).
-            if self.debug: print(f"[WARN] LED update failed: {e}")
+            if self.debug:
+                # These prints make behavior traceable during live demos and troubleshooting.
+                print(f"State: {_STATES[idx]}")
+                print(f"SetPoint: {self.setPoint}")
+                print(f"Temp: {temp}")
+
+            try:
+                # One tuple index selects the LED policy for the current state.
+                self._led_actions[idx](temp)
+            except Exception as e:
+                # LED failures should not crash the control loop (GPIO permission, hardware disconnect).
+                if self.debug: print(f"[WARN] LED update failed: {e}")
+
+    # ---------- LED policies (one per FSM state) ----------
+    # Each receives the whole-degree temperature and is dispatched from updateLights().
+
+    # Off state: no heating/cooling indication.
+    def _lights_off(self, temp):
+        self._submit(self.hal.leds_off)
+
+    # Heat state: red indicator reflects whether heating is "required".
+    def _lights_heat(self, temp):
+        if temp < self.setPoint:
+            # Below setpoint: blink/fade indicates active heating demand.
+            self._submit(self.hal.red_blink, self.cfg.BLINK_ON, self.cfg.BLINK_OFF, self.cfg.FADE_IN, self.cfg.FADE_OUT)
+        else:
+            # At/above setpoint: solid indicates target is satisfied.
+            self._submit(self.hal.red_solid)
+
+    # Cool state: blue indicator reflects whether cooling is "required".
+    def _lights_cool(self, temp):
+        if temp > self.setPoint:
+            # Above setpoint: blink/fade indicates active cooling demand.
+            self._submit(self.hal.blue_blink, self.cfg.BLINK_ON, self.cfg.BLINK_OFF, self.cfg.FADE_IN, self.cfg.FADE_OUT)
+        else:
+            # At/below setpoint: solid indicates target is satisfied.
+            self._submit(self.hal.blue_solid)
 
     # Build a compact telemetry payload.
     # 
     #     Format: "<state>, <temp_f>, <setpoint>"
     #     Designed for low-bandwidth serial/UART transport and easy parsing on a receiver.
-    def status_string(self) -> str:
-        return f"{self.current_state.id}, {self.safe_temp_f():.2f}, {self.setPoint}"
+    # 
+    #     Args:
+    #         temp_f: Temperature already sampled by the caller; read when omitted.
+    def status_string(self, temp_f=None) -> str:
+        if temp_f is None:
+            temp_f = self.safe_temp_f()
+        with self._lock:
+            state, sp = self.current_state_id, self.setPoint
+        return "%s, %.2f, %d" % (state, temp_f, sp)
+
+    # Prime the controller's hot paths once at boot.
+    # 
+    #     Runs the sensor read, LED policy, telemetry formatting and timestamp
+    #     formatting a first time so one-off costs (first I2C measurement, lazy
+    #     locale/strftime setup, attribute caches) are paid before steady-state
+    #     operation. Also leaves the indicators reflecting current state immediately.
+    #     Nothing is sent over serial so the telemetry stream keeps its format.
+    #     The sensor is sampled once and the reading shared, as in a display tick.
+    def warmup(self):
+        temp_f = self.safe_temp_f()
+        self.updateLights(temp_f)
+        self.status_string(temp_f)
+        strftime(_TIME_FMT, localtime())
 
     # ---------- Thread lifecycle ----------
-    # Start the controller background loop.
+    # Start the controller background loops (HAL I/O worker + display loop).
     # 
-    #     The loop is daemonized so the program can exit if main thread terminates,
+    #     The loops are daemonized so the program can exit if main thread terminates,
     #     but 'stop()' is still used for a clean shutdown and hardware cleanup.
     def start(self):
+        # Worker first so the display loop's first commands are consumed immediately.
+        self._io_thread = Thread(target=self._io_worker, daemon=True)
+        self._io_thread.start()
         self._thread = Thread(target=self._display_loop, daemon=True)
         self._thread.start()
 
@@ -153,13 +256,17 @@ class ThermostatController(StateMachine):
     # 
     # Behavior:
     # - Signals the background loop to stop using an Event
-    # - Joins the thread with a timeout to avoid hanging
+    # - Drains the I/O queue (sentinel) so pending HAL commands run before close
+    # - Joins the threads with a timeout to avoid hanging
     # - Calls HAL.close() to release device handles (LCD, UART, GPIO, etc.)
     def stop(self):
         self._stop.set()
         if self._thread:
             # Timeout prevents indefinite blocking if thread is stuck in a hardware call.
             self._thread.join(timeout=2.0)
+        if self._io_thread:
+            self._cmdq.put(None)
+            self._io_thread.join(timeout=2.0)
         try:
             # HAL is responsible for leaving the hardware in a safe state.
             self.hal.close()
@@ -167,48 +274,94 @@ class ThermostatController(StateMachine):
             # Never raise during shutdown; best-effort cleanup is acceptable here.
             pass
 
+    # HAL I/O worker: the only thread that issues LCD/LED/serial operations.
+    # 
+    #     Commands are executed in submission order until the None sentinel from stop().
+    #     Failures are logged and skipped so one bad transaction cannot stall the queue.
+    def _io_worker(self):
+        while True:
+            cmd = self._cmdq.get()
+            if cmd is None:
+                break
+            op, args = cmd
+            self._run_io(op, args)
+
     # Background loop responsible for:
     #     - Updating LCD display text (time + alternating status line)
     #     - Refreshing LED state periodically
     #     - Sending serial telemetry periodically
     # 
     #     The loop uses Event.wait() to provide a sleep that can be interrupted by stop().
+    #     Ticks are scheduled against absolute monotonic deadlines, so time spent doing
+    #     work inside an iteration does not accumulate as drift in the periodic actions.
+    #     LCD writes are skipped when the rendered text matches the last write.
     def _display_loop(self):
         counter = 0  # coarse seconds counter used for periodic actions
         alt = 0      # controls alternating between display modes
+        last_sec = None    # wall-clock second currently rendered in line1
+        line1 = ""
+        last_lines = None  # last (line1, line2) queued for the LCD
+        period = self.cfg.DISPLAY_REFRESH_SEC
+        next_tick = monotonic()  # absolute deadline of the current tick
 
         while not self._stop.is_set():
             # Capture current timestamp for display; controller treats time as a presentation concern here.
-            now = datetime.now()
-            line1 = now.strftime("%m/%d %H:%M:%S")
+            # Only re-format when the wall-clock second has actually changed.
+            now_s = int(time())
+            if now_s != last_sec:
+                line1 = strftime(_TIME_FMT, localtime(now_s))
+                last_sec = now_s
+
+            # Decide which periodic actions fire this tick.
+            show_temp = alt < 5
+            refresh_lights = counter % self.cfg.LIGHT_REFRESH_EVERY_SEC == 0
+            send_status = counter % self.cfg.SERIAL_SEND_INTERVAL_SEC == 0
+
+            # Sample the sensor at most once per tick and share the reading with every
+            # consumer below (LCD line, LED refresh, telemetry).
+            temp_f = self.safe_temp_f() if (show_temp or refresh_lights or send_status) else None
 
             # Alternate the second line to show both real-time temperature and system state/setpoint.
-            if alt < 5:
-                line2 = f"Temp: {self.safe_temp_f():.1f}"
+            if show_temp:
+                line2 = f"Temp: {temp_f:.1f}"
             else:
-                line2 = f"{self.current_state.id} Set:{self.setPoint}"
+                # Snapshot state and setpoint together so the pair is consistent.
+                with self._lock:
+                    state, sp = self.current_state_id, self.setPoint
+                line2 = f"{state} Set:{sp}"
             alt = (alt + 1) % 10
 
-            try:
+            # Skip the LCD transaction entirely when nothing on screen would change.
+            # A write the I/O worker reported as failed is forgotten so it is retried.
+            if self._display_failed.is_set():
+                self._display_failed.clear()
+                last_lines = None
+            lines = (line1, line2)
+            if lines != last_lines:
                 # HAL abstracts LCD update (controller remains display-device agnostic).
-                self.hal.display(line1, line2)
-            except Exception as e:
-                # Display failures should not terminate the loop. Log and continue.
-                if self.debug: print(f"[WARN] Display update failed: {e}")
+                # Failures are handled on the I/O worker (see _run_io).
+                self._submit(self.hal.display, line1, line2)
+                last_lines = lines
 
             # Refresh lights occasionally to keep indicators consistent if external factors change.
-            if counter % self.cfg.LIGHT_REFRESH_EVERY_SEC == 0:
-                self.updateLights()
+            if refresh_lights:
+                self.updateLights(temp_f)
 
             # Send status periodically for external monitoring/logging.
-            if counter % self.cfg.SERIAL_SEND_INTERVAL_SEC == 0:
-                try:
-                    self.hal.serial_send(self.status_string())
-                except Exception as e:
-                    # Serial may fail if device is absent or permissions change; keep system running.
-                    if self.debug: print(f"[WARN] Serial send failed: {e}")
+            # Serial failures (device absent, permissions) are logged by the I/O worker.
+            if send_status:
+                self._submit(self.hal.serial_send, self.status_string(temp_f))
 
             counter += 1
 
-            # Sleep in an interruptible way: wakes early when stop() sets the event.
-            self._stop.wait(self.cfg.DISPLAY_REFRESH_SEC)
+            # Sleep until the next absolute deadline in an interruptible way:
+            # wakes early when stop() sets the event.
+            next_tick += period
+            remaining = next_tick - monotonic()
+            if remaining < 0:
+                # Overrun (e.g. a blocking sensor read): resynchronize instead of
+                # firing a burst of catch-up ticks.
+                if self.debug: print(f"[WARN] Display loop overran by {-remaining:.3f}s")
+                next_tick = monotonic()
+                remaining = 0.0
+            self._stop.wait(remaining)
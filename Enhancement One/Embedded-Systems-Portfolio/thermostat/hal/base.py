@@ -13,6 +13,20 @@
 
 from typing import Protocol
 
+# Button press-event handle returned by ThermostatHAL.setup_buttons().
+class ButtonEvents(Protocol):
+    # Block until at least one button is pressed or the timeout elapses.
+    # 
+    #     Args:
+    #         timeout (float): Maximum wait in seconds.
+    # 
+    #     Returns:
+    #         list[int]: Pins pressed, in event order (empty on timeout).
+    def wait_event(self, timeout: float) -> list[int]: ...
+
+    # Release the underlying input resources.
+    def close(self) -> None: ...
+
 # Thermostat Hardware Abstraction Layer contract.
 # 
 #     Any concrete HAL implementation (Raspberry Pi, FakeHAL, future platforms)
@@ -65,6 +79,16 @@ class ThermostatHAL(Protocol):
     #         fade_out (float): Fade-out duration in seconds.
     def blue_blink(self, on: float, off: float, fade_in: float, fade_out: float) -> None: ...
 
+    # ---------- Button Inputs ----------
+    # Configure the push-button pins in one pass.
+    # 
+    #     Args:
+    #         pins (list[int]): Pin numbers of the buttons (active-low, pulled up).
+    # 
+    #     Returns:
+    #         ButtonEvents: Handle used to wait for presses.
+    def setup_buttons(self, pins: list[int]) -> ButtonEvents: ...
+
     # ---------- Display Output ----------
     # Update the LCD display.
     # 
@@ -81,10 +105,16 @@ class ThermostatHAL(Protocol):
     # 
     #     Args:
     #         message (str): Serialized thermostat state payload.
+    #         flush (bool): Transmit immediately (default). When False the
+    #             implementation may buffer the message and send it together
+    #             with later ones.
     # 
     #     Intended for external monitoring, logging, or integration
     #     with other systems.
-    def serial_send(self, message: str) -> None: ...
+    def serial_send(self, message: str, flush: bool = True) -> None: ...
+
+    # Transmit any messages buffered by serial_send(..., flush=False).
+    def serial_flush(self) -> None: ...
 
     # ---------- Resource Cleanup ----------
     # Release all hardware resources and return the system to a safe state.
@@ -92,6 +122,6 @@ class ThermostatHAL(Protocol):
     #     Implementations should:
     #     - Stop LED activity
     #     - Clear or power down the display
-    #     - Close serial ports
-    #     - Release GPIO resources
+    #     - Flush and close serial ports
+    #     - Release GPIO resources (including button lines)
     def close(self) -> None: ...
@@ -11,6 +11,45 @@
 
 from __future__ import annotations
 from collections import deque
+from queue import Queue, Empty
+
+# Maximum number of telemetry messages retained in FakeHAL.serial_out.
+# Keeps long-running demos at a fixed memory footprint (oldest messages drop first).
+SERIAL_OUT_MAXLEN = 1024
+
+
+# Simulated button handle returned by FakeHAL.setup_buttons().
+# 
+#     Tests and demos call press(pin) to inject a button press; wait_event()
+#     reports it exactly as the real handle would, so the same event loop can
+#     be driven without GPIO hardware.
+class FakeButtons:
+    def __init__(self, pins):
+        self.pins = tuple(pins)
+        self._presses = Queue()
+
+    # Inject a press of the given pin (thread-safe).
+    def press(self, pin: int) -> None:
+        self._presses.put(pin)
+
+    # Block until at least one press is queued or the timeout elapses.
+    # 
+    #     Returns:
+    #         list[int]: Pins pressed, in order (empty on timeout).
+    def wait_event(self, timeout: float) -> list:
+        try:
+            pins = [self._presses.get(timeout=timeout)]
+        except Empty:
+            return []
+        while True:
+            try:
+                pins.append(self._presses.get_nowait())
+            except Empty:
+                return pins
+
+    # Nothing to release; present for API parity with the real handle.
+    def close(self) -> None:
+        pass
 
 
 # Fake hardware implementation for testing ThermostatController logic
@@ -18,9 +57,10 @@ from collections import deque
 #
 # What this class simulates:
 # - Sensor: read_temp_f() cycles through a predefined list of temperatures.
-# - LEDs: stores the most recent LED "state" as a string for easy assertions.
+# - LEDs: stores the most recent LED "state" (a name, or a tuple for blinks) for easy assertions.
 # - Display: stores the most recent LCD lines.
-# - Serial: captures outbound messages in a list to validate telemetry behavior.
+# - Buttons: setup_buttons() returns a FakeButtons handle that accepts injected presses.
+# - Serial: captures outbound messages in a bounded deque to validate telemetry behavior.
 #
 # Design principles:
 # - Simple: behavior is intentionally minimal and predictable.
@@ -34,10 +74,12 @@ from collections import deque
 #     what would have been sent to hardware.
 # 
 #     Attributes:
-#         temps (deque[float]): Circular buffer of temperature readings.
-#         led_state (str): Last LED state requested by controller (e.g., "red_solid").
+#         temps (tuple[float, ...]): Immutable sequence of temperature readings.
+#         led_state (str | tuple): Last LED state requested by controller (e.g., "red_solid",
+#             or ("red_blink", on, off, fade_in, fade_out) for blink requests).
 #         last_display (tuple[str, str]): Last two lines written to the LCD.
-#         serial_out (list[str]): List of telemetry messages sent via serial_send().
+#         serial_out (deque[str]): Most recent telemetry messages sent via serial_send().
+#         buttons (FakeButtons | None): Handle created by setup_buttons(), if called.
 #         closed (bool): Flag indicating whether close() was called.
 class FakeHAL:
 
@@ -48,15 +90,17 @@ class FakeHAL:
     #                defaults to a single constant reading of 72.0°F.
     # 
     #     Implementation detail:
-    #     - Uses deque + rotate to cycle readings without index bookkeeping.
+    #     - Uses an immutable tuple plus a wrapping index to cycle readings.
     def __init__(self, temps=None):
         # Store temps as floats to ensure consistent numeric behavior.
-        self.temps = deque([float(t) for t in (temps or [72.0])])
+        self.temps = tuple(float(t) for t in (temps or [72.0]))
+        self._i = 0  # index of the next reading to return
 
         # Output observability fields (controller writes here instead of hardware).
         self.led_state = "off"
         self.last_display = ("", "")
-        self.serial_out = []
+        self.serial_out = deque(maxlen=SERIAL_OUT_MAXLEN)
+        self.buttons = None
 
         # Cleanup tracking (useful for verifying proper shutdown behavior).
         self.closed = False
@@ -65,13 +109,13 @@ class FakeHAL:
     # Return a simulated temperature reading in Fahrenheit.
     # 
     #     Behavior:
-    #     - Returns the current head element of the deque.
-    #     - Rotates left so the next call returns the next value.
+    #     - Returns the reading at the current index.
+    #     - Advances the index (wrapping) so the next call returns the next value.
     #     - Cycles indefinitely (repeatable pattern).
     def read_temp_f(self) -> float:
-        # Rotate through temp readings to simulate changing environment.
-        temp = self.temps[0]
-        self.temps.rotate(-1)
+        # Step through temp readings to simulate changing environment.
+        temp = self.temps[self._i]
+        self._i = (self._i + 1) % len(self.temps)
         return temp
 
     # --- LEDs ---
@@ -89,16 +133,25 @@ class FakeHAL:
 
     # Simulate red LED blinking/fading by recording timing parameters.
     # 
-    #     These parameters are captured so tests can confirm that the controller
-    #     issued the correct blink policy based on configuration and state.
+    #     These parameters are captured (as a tuple, no string formatting) so tests can
+    #     confirm that the controller issued the correct blink policy based on
+    #     configuration and state.
     def red_blink(self, on: float, off: float, fade_in: float, fade_out: float) -> None:
-        self.led_state = f"red_blink(on={on},off={off},fade_in={fade_in},fade_out={fade_out})"
+        self.led_state = ("red_blink", on, off, fade_in, fade_out)
 
     # Simulate blue LED blinking/fading by recording timing parameters.
     # 
     #     Captures the parameters for easy validation in tests and demos.
     def blue_blink(self, on: float, off: float, fade_in: float, fade_out: float) -> None:
-        self.led_state = f"blue_blink(on={on},off={off},fade_in={fade_in},fade_out={fade_out})"
+        self.led_state = ("blue_blink", on, off, fade_in, fade_out)
+
+    # --- Buttons ---
+    # Return a simulated button handle for the given pins.
+    # 
+    #     The handle is also kept on self.buttons so tests can inject presses.
+    def setup_buttons(self, pins) -> FakeButtons:
+        self.buttons = FakeButtons(pins)
+        return self.buttons
 
     # --- Display ---
     # Simulate an LCD update by storing the last written lines.
@@ -112,13 +165,20 @@ class FakeHAL:
 
     # --- Serial ---
     # Simulate UART transmission by appending messages to serial_out.
+    # Once SERIAL_OUT_MAXLEN messages are held, the oldest is discarded.
     # 
     #     This enables tests to validate:
     #     - Payload formatting (state, temp, setpoint)
     #     - Send frequency (when driven by controller loop timing)
-    def serial_send(self, message: str) -> None:
+    # 
+    #     Messages are recorded immediately; `flush` is accepted for API parity.
+    def serial_send(self, message: str, flush: bool = True) -> None:
         self.serial_out.append(message)
 
+    # Nothing is buffered, so there is nothing to flush.
+    def serial_flush(self) -> None:
+        pass
+
     # --- Cleanup ---
     # Mark the HAL as closed.
     # 
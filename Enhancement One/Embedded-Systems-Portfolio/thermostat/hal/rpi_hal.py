@@ -3,7 +3,7 @@
 # This module provides the concrete Raspberry Pi implementation of the
 # ThermostatHAL interface. It encapsulates all direct interactions with:
 # 
-# - GPIO (LEDs)
+# - GPIO (LEDs, push buttons)
 # - I2C temperature sensor
 # - Character LCD
 # - UART / Serial communication
@@ -13,13 +13,99 @@
 # - Allow safe replacement with FakeHAL for testing
 # - Centralize device initialization and cleanup
 
-import serial
+import os
+import termios
+from datetime import timedelta
+from time import monotonic
+import gpiod
+from gpiod.line import Bias, Edge
 import board
 import digitalio
 import adafruit_ahtx0
 import adafruit_character_lcd.character_lcd as characterlcd
 from gpiozero import PWMLED
 
+# Character LCD geometry (16x2 HD44780-compatible module).
+_LCD_COLS = 16
+_LCD_ROWS = 2
+
+# Size of the reusable UART transmit buffer; telemetry frames are ~20 bytes.
+_TX_BUF_SIZE = 256
+
+# Pending UART bytes that trigger a write when buffering (serial_send(..., flush=False)).
+_TX_FLUSH_THRESHOLD = 512
+
+# I2C bus and AHTx0 driver shared by every RpiHAL instance in the process.
+# Creating the driver probes the sensor (address check + soft reset + calibration),
+# so it is done once; RpiHAL.close() deliberately leaves these alive.
+_I2C_BUS = None
+_AHT_SENSOR = None
+
+# Return the shared (I2C bus, AHTx0 sensor) pair, creating them on first use.
+def _shared_sensor():
+    global _I2C_BUS, _AHT_SENSOR
+    if _I2C_BUS is None:
+        _I2C_BUS = board.I2C()
+    if _AHT_SENSOR is None:
+        _AHT_SENSOR = adafruit_ahtx0.AHTx0(_I2C_BUS)
+    return _I2C_BUS, _AHT_SENSOR
+
+# Open a UART device for raw, write-only use and configure it once.
+# 
+#     Line settings: 8 data bits, no parity, 1 stop bit (8N1), no flow control,
+#     and no input/output post-processing (bytes go out exactly as written).
+# 
+#     Args:
+#         port: TTY device path (e.g. "/dev/ttyS0").
+#         baud: Baud rate; must be a standard termios rate (e.g. 115200).
+# 
+#     Returns:
+#         int: File descriptor ready for os.write().
+def _open_uart(port: str, baud: int) -> int:
+    speed = getattr(termios, f"B{baud}")
+    fd = os.open(port, os.O_WRONLY | os.O_NOCTTY)
+    try:
+        attrs = termios.tcgetattr(fd)
+        attrs[0] = 0                                                 # iflag: no input processing
+        attrs[1] = 0                                                 # oflag: raw output
+        attrs[2] = termios.CS8 | termios.CREAD | termios.CLOCAL      # cflag: 8N1, ignore modem lines
+        attrs[3] = 0                                                 # lflag: non-canonical, no echo
+        attrs[4] = attrs[5] = speed                                  # ispeed / ospeed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    except Exception:
+        os.close(fd)
+        raise
+    return fd
+
+# libgpiod implementation of the ButtonEvents contract (see hal/base.py).
+# 
+#     Wraps a single libgpiod (v2) line request covering every button pin, so one
+#     kernel wait (poll on the request fd) reports presses on any of them.
+#     Contact bounce is filtered by the kernel (debounce_period on the request),
+#     so every falling edge read here is one logical press.
+class GpiodButtonEvents:
+    # Args:
+    #     request: gpiod.LineRequest already configured for debounced falling-edge events.
+    def __init__(self, request):
+        self._request = request
+
+    # Block until at least one button is pressed or the timeout elapses.
+    # 
+    #     Args:
+    #         timeout: Maximum wait in seconds.
+    # 
+    #     Returns:
+    #         list[int]: BCM pins pressed, in event order (empty on timeout).
+    def wait_event(self, timeout: float) -> list:
+        if not self._request.wait_edge_events(timeout):
+            return []
+        # Consume every queued edge so none is reported again on the next wait.
+        return [event.line_offset for event in self._request.read_edge_events()]
+
+    # Release the line request (and the chip handle it holds).
+    def close(self) -> None:
+        self._request.release()
+
 # Raspberry Pi implementation of the Thermostat HAL.
 # 
 #     This class owns all hardware resources and is responsible for:
@@ -27,6 +113,10 @@ from gpiozero import PWMLED
 #     - Translating abstract controller commands into hardware actions
 #     - Leaving the system in a safe state on shutdown
 class RpiHAL:
+    # Celsius -> Fahrenheit conversion (F = C * 1.8 + 32), precomputed once.
+    _C_TO_F_SCALE = 1.8
+    _C_TO_F_OFFSET = 32.0
+
     # Initialize all hardware peripherals using values from configuration.
     # 
     #     Args:
@@ -36,22 +126,30 @@ class RpiHAL:
         # ---------------------------
         # Temperature Sensor (I2C)
         # ---------------------------
-        # Shared I2C bus used for environmental sensors.
-        self.i2c = board.I2C()
-        self.sensor = adafruit_ahtx0.AHTx0(self.i2c)
+        # Shared I2C bus used for environmental sensors (reused across HAL instances).
+        self.i2c, self.sensor = _shared_sensor()
+
+        # Short-lived cache of the last measurement (Celsius). Each AHTx0 property
+        # access triggers a full measurement cycle, so readers within the TTL reuse it.
+        self._sensor_cache = None
+        self._sensor_cache_ts = 0.0
+        self._sensor_ttl = cfg.SENSOR_CACHE_TTL_SEC
 
         # ---------------------------
         # Serial (UART)
         # ---------------------------
         # Used for periodic telemetry output to an external system.
-        self.ser = serial.Serial(
-            port=cfg.SERIAL_PORT,
-            baudrate=cfg.SERIAL_BAUD,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            bytesize=serial.EIGHTBITS,
-            timeout=cfg.SERIAL_TIMEOUT
-        )
+        # Held as a raw file descriptor so each send is a single write(2) syscall.
+        self._uart_fd = _open_uart(cfg.SERIAL_PORT, cfg.SERIAL_BAUD)
+
+        # Reusable transmit buffer: immediate frames (payload + newline) are assembled
+        # in place so sending does not allocate a concatenated bytes object each time.
+        self._tx_buf = bytearray(_TX_BUF_SIZE)
+        self._tx_view = memoryview(self._tx_buf)
+
+        # Deferred frames (serial_send(..., flush=False)) accumulate here and are
+        # written together in one syscall at a flush boundary.
+        self._tx_pending = bytearray()
 
         # ---------------------------
         # LED Outputs
@@ -60,6 +158,18 @@ class RpiHAL:
         self.red = PWMLED(cfg.RED_LED_PIN)
         self.blue = PWMLED(cfg.BLUE_LED_PIN)
 
+        # Last LED mode applied, e.g. ("red_solid",) or ("blue_blink", on, off, fi, fo).
+        # Used to skip redundant writes (which would also restart a running fade).
+        self._led_state = None
+
+        # ---------------------------
+        # Button Inputs
+        # ---------------------------
+        # Configured on demand by setup_buttons(); the chip is kept from config.
+        self._gpio_chip = cfg.GPIO_CHIP
+        self._debounce_sec = cfg.BUTTON_DEBOUNCE_SEC
+        self._buttons = None
+
         # ---------------------------
         # LCD Display Wiring
         # ---------------------------
@@ -72,46 +182,93 @@ class RpiHAL:
         self.lcd_d6 = digitalio.DigitalInOut(board.D13)
         self.lcd_d7 = digitalio.DigitalInOut(board.D26)
 
+        # Single source of truth for the LCD pin set (used again by close()).
+        self._lcd_pins = (self.lcd_rs, self.lcd_en, self.lcd_d4, self.lcd_d5, self.lcd_d6, self.lcd_d7)
+
         # Initialize a 16x2 monochrome character LCD.
         self.lcd = characterlcd.Character_LCD_Mono(
             self.lcd_rs, self.lcd_en,
             self.lcd_d4, self.lcd_d5, self.lcd_d6, self.lcd_d7,
-            16, 2
+            _LCD_COLS, _LCD_ROWS
         )
 
         # Clear display on startup to avoid showing stale data.
         self.lcd.clear()
 
+        # Lines currently shown on the LCD; (None, None) forces the first write.
+        self._last_lines = (None, None)
+
+        # Set once close() has run; later calls return immediately.
+        self._closed = False
+
     # --- Sensor ---
+    # Return the sensor temperature (Celsius), measuring only when the cache is stale.
+    # 
+    #     Any future reading derived from the same measurement (e.g. humidity) should
+    #     go through this path so one I2C cycle serves every consumer in a tick.
+    def _read_sensor_cached(self) -> float:
+        now = monotonic()
+        if self._sensor_cache is None or now - self._sensor_cache_ts > self._sensor_ttl:
+            self._sensor_cache = self.sensor.temperature
+            self._sensor_cache_ts = now
+        return self._sensor_cache
+
     # Read the ambient temperature from the sensor and convert to Fahrenheit.
     # 
     #     Returns:
     #         float: Temperature in degrees Fahrenheit.
     def read_temp_f(self) -> float:
-        c = self.sensor.temperature
-        return (9.0 / 5.0) * c + 32.0
+        return self._read_sensor_cached() * RpiHAL._C_TO_F_SCALE + RpiHAL._C_TO_F_OFFSET
 
     # --- LEDs ---
+    # Drive both steady LED outputs through a single primitive.
+    # 
+    #     Writing `value` (rather than on()/off()) also cancels any running blink,
+    #     and the LED being switched off is written first so both are never lit
+    #     together during a transition.
+    # 
+    #     Args:
+    #         red: Red LED brightness (0.0 - 1.0)
+    #         blue: Blue LED brightness (0.0 - 1.0)
+    def _set_leds(self, red: float, blue: float) -> None:
+        if red:
+            self.blue.value = blue
+            self.red.value = red
+        else:
+            self.red.value = red
+            self.blue.value = blue
+
+    # Apply an LED mode unless it is already active.
+    # 
+    #     The mode is recorded only after `apply` succeeds, so a failed write is
+    #     retried on the next request instead of being masked.
+    # 
+    #     Args:
+    #         state: Tuple identifying the mode and its parameters.
+    #         apply: Zero-argument callable performing the GPIO/PWM writes.
+    def _set_led_state(self, state: tuple, apply) -> None:
+        if state == self._led_state:
+            return
+        apply()
+        self._led_state = state
+
     # Turn off all LED indicators.
     # 
     #     Used when the thermostat is in OFF mode or during shutdown.
     def leds_off(self) -> None:
-        self.red.off()
-        self.blue.off()
+        self._set_led_state(("off",), lambda: self._set_leds(0, 0))
 
     # Illuminate the red LED steadily.
     # 
     #     Indicates heating target has been reached or exceeded.
     def red_solid(self) -> None:
-        self.blue.off()
-        self.red.on()
+        self._set_led_state(("red_solid",), lambda: self._set_leds(1, 0))
 
     # Illuminate the blue LED steadily.
     # 
     #     Indicates cooling target has been satisfied.
     def blue_solid(self) -> None:
-        self.red.off()
-        self.blue.on()
+        self._set_led_state(("blue_solid",), lambda: self._set_leds(0, 1))
 
     # Blink/fade the red LED to indicate active heating demand.
     # 
@@ -121,8 +278,10 @@ class RpiHAL:
     #         fade_in: Fade-in duration (seconds)
     #         fade_out: Fade-out duration (seconds)
     def red_blink(self, on, off, fade_in, fade_out) -> None:
-        self.blue.off()
-        self.red.blink(on_time=on, off_time=off, fade_in_time=fade_in, fade_out_time=fade_out)
+        def apply():
+            self.blue.off()
+            self.red.blink(on_time=on, off_time=off, fade_in_time=fade_in, fade_out_time=fade_out)
+        self._set_led_state(("red_blink", on, off, fade_in, fade_out), apply)
 
     # Blink/fade the blue LED to indicate active cooling demand.
     # 
@@ -132,35 +291,124 @@ class RpiHAL:
     #         fade_in: Fade-in duration (seconds)
     #         fade_out: Fade-out duration (seconds)
     def blue_blink(self, on, off, fade_in, fade_out) -> None:
-        self.red.off()
-        self.blue.blink(on_time=on, off_time=off, fade_in_time=fade_in, fade_out_time=fade_out)
+        def apply():
+            self.red.off()
+            self.blue.blink(on_time=on, off_time=off, fade_in_time=fade_in, fade_out_time=fade_out)
+        self._set_led_state(("blue_blink", on, off, fade_in, fade_out), apply)
+
+    # --- Buttons ---
+    # Configure all push-button pins in one pass and return their event handle.
+    # 
+    #     Every pin is requested in a single gpiod.request_lines() call with pull-up
+    #     bias and falling-edge (press) detection, replacing one open + ioctl
+    #     sequence per pin. The kernel debounces each line by cfg.BUTTON_DEBOUNCE_SEC:
+    #     a level change is reported only once the line has been stable that long,
+    #     so bounce on both press and release is absorbed before an edge is queued.
+    # 
+    #     Args:
+    #         pins: BCM pin numbers of the buttons.
+    # 
+    #     Returns:
+    #         GpiodButtonEvents: Handle whose wait_event() reports pressed pins.
+    def setup_buttons(self, pins) -> GpiodButtonEvents:
+        settings = gpiod.LineSettings(
+            edge_detection=Edge.FALLING,
+            bias=Bias.PULL_UP,
+            debounce_period=timedelta(seconds=self._debounce_sec)
+        )
+        request = gpiod.request_lines(
+            self._gpio_chip,
+            consumer="thermostat",
+            config={tuple(pins): settings}
+        )
+        self._buttons = GpiodButtonEvents(request)
+        return self._buttons
 
     # --- Display ---
     # Update the LCD display with two lines of text.
     # 
+    #     Both lines are padded/truncated to exactly the display width, so every write
+    #     fully overwrites its row and the slow HD44780 clear command is never needed.
+    #     An unchanged pair is a no-op; if only one row changed, only that row is
+    #     rewritten; otherwise both rows go out as one fixed-length message.
+    # 
     #     Args:
     #         line1: First line (typically date/time)
     #         line2: Second line (temperature, state, or setpoint)
     def display(self, line1: str, line2: str) -> None:
-        self.lcd.clear()
-        self.lcd.message = f"{line1}\n{line2}"
+        lines = (f"{line1[:_LCD_COLS]:<{_LCD_COLS}}", f"{line2[:_LCD_COLS]:<{_LCD_COLS}}")
+        old = self._last_lines
+        if lines == old:
+            return
+        if lines[0] != old[0] and lines[1] != old[1]:
+            self.lcd.cursor_position(0, 0)
+            self.lcd.message = f"{lines[0]}\n{lines[1]}"
+        else:
+            row = 0 if lines[0] != old[0] else 1
+            self.lcd.cursor_position(0, row)
+            self.lcd.message = lines[row]
+        self._last_lines = lines
 
     # --- Serial ---
     # Send a single telemetry message over the serial interface.
     # 
     #     Args:
     #         message: Serialized thermostat state payload
-    def serial_send(self, message: str) -> None:
-        self.ser.write(message.encode())
-        self.ser.write(b"\n")
+    #         flush: Write immediately (default). Pass False for bursts of messages;
+    #                they are then written together once _TX_FLUSH_THRESHOLD bytes
+    #                are pending or on the next flushing send / serial_flush().
+    def serial_send(self, message: str, flush: bool = True) -> None:
+        encoded = message.encode()
+        if not flush:
+            self._tx_pending += encoded
+            self._tx_pending.append(0x0A)  # b"\n" frame terminator
+            if len(self._tx_pending) >= _TX_FLUSH_THRESHOLD:
+                self.serial_flush()
+            return
+
+        # Deferred frames go out first so frame order is preserved.
+        self.serial_flush()
+        n = len(encoded)
+        if n < _TX_BUF_SIZE:
+            self._tx_buf[:n] = encoded
+            self._tx_buf[n] = 0x0A  # b"\n"
+            self._uart_write(self._tx_view[:n + 1])
+        else:
+            # Oversized frame (not produced by the controller): fall back to a one-off buffer.
+            self._uart_write(encoded + b"\n")
+
+    # Write any buffered serial frames, normally in a single syscall.
+    def serial_flush(self) -> None:
+        if self._tx_pending:
+            self._uart_write(self._tx_pending)
+            self._tx_pending.clear()
+
+    # Write every byte of `data` to the UART.
+    # 
+    #     os.write() may accept only part of the buffer (e.g. a signal arriving during
+    #     a large batch), so the remainder is resubmitted until nothing is left.
+    # 
+    #     Args:
+    #         data: bytes-like object to transmit.
+    def _uart_write(self, data) -> None:
+        with memoryview(data) as view:
+            sent = 0
+            while sent < len(view):
+                sent += os.write(self._uart_fd, view[sent:])
 
     # --- Cleanup ---
     # Release all hardware resources and leave the system in a safe state.
     # 
     #     This method is designed to be:
-    #     - Idempotent (safe to call once)
-    #     - Best-effort (cleanup failures should not crash shutdown)
+    #     - Idempotent (repeat calls return immediately via the _closed flag)
+    #     - Best-effort (each step is isolated so one failure does not skip the rest)
+    # 
+    #     The shared I2C bus and sensor driver are not released (see _shared_sensor).
     def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
         # Clear display if possible.
         try:
             self.lcd.clear()
@@ -168,7 +416,7 @@ class RpiHAL:
             pass
         
         # Deinitialize all LCD GPIO pins.
-        for pin in [self.lcd_rs, self.lcd_en, self.lcd_d4, self.lcd_d5, self.lcd_d6, self.lcd_d7]:
+        for pin in self._lcd_pins:
             try:
                 pin.deinit()
             except Exception:
@@ -180,8 +428,19 @@ class RpiHAL:
         except Exception:
             pass
 
-        # Close serial port.
+        # Release button lines.
+        try:
+            if self._buttons is not None:
+                self._buttons.close()
+        except Exception:
+            pass
+
+        # Write out any buffered telemetry, then close serial port.
+        try:
+            self.serial_flush()
+        except Exception:
+            pass
         try:
-            self.ser.close()
+            os.close(self._uart_fd)
         except Exception:
             pass
@@ -6,21 +6,69 @@ MongoDB animal shelter data.
 
 Features:
 - Environment-safe connection
+- Shared, pooled MongoClient per connection string
 - Indexed collections
 - Projection support
 - Pagination support
 - Aggregation pipelines
 """
 
-from pymongo import MongoClient, errors, ASCENDING, DESCENDING
+import logging
+from itertools import islice
+from threading import Lock
+
+from pymongo import MongoClient, errors, ASCENDING, DESCENDING, ReturnDocument
 from bson.objectid import ObjectId
 
 
+logger = logging.getLogger(__name__)
+
+# MongoClient instances shared across Animal_Shelter objects, keyed by URI.
+# MongoClient is thread-safe and owns its own connection pool and monitor threads,
+# so one client per process/URI avoids reconnect + auth on every instantiation.
+_CLIENT_CACHE: dict[str, MongoClient] = {}
+_CLIENT_CACHE_LOCK = Lock()
+
+# Upper bound on documents fetched per network batch by read()/iter_read().
+MAX_BATCH_SIZE = 1000
+
+# _id of the counters document that allocates rec_num values.
+REC_NUM_COUNTER_ID = "animals_rec_num"
+
+# Fields of the idx_rescue_filters compound index (in index order).
+RESCUE_FILTER_FIELDS = (
+    "animal_type",
+    "sex_upon_outcome",
+    "age_upon_outcome_in_weeks",
+    "breed",
+)
+
+# Projection applied by read()/iter_read() when none is given and the query filters
+# on animal_type (the idx_rescue_filters prefix) plus only other rescue fields.
+# It keeps just that index's keys (no _id) to shrink the payload; the read is
+# index-only when the planner picks idx_rescue_filters, which is not guaranteed.
+# Pass projection={} to get full documents.
+DEFAULT_PROJECTION = {
+    "animal_type": 1,
+    "sex_upon_outcome": 1,
+    "age_upon_outcome_in_weeks": 1,
+    "breed": 1,
+    "_id": 0,
+}
+
+
 class Animal_Shelter(object):
     """
     Encapsulates CRUD operations for the animals collection.
     """
 
+    # (host, port, database, collection) targets whose indexes were already
+    # ensured in this process; later instances skip the createIndexes round-trips.
+    _indexes_ensured: set[tuple] = set()
+
+    # Targets whose rec_num counter was already seeded in this process.
+    _counters_seeded: set[tuple] = set()
+
     def __init__(self, user, password, host, port, database, collection, auth_source=None):
         """
         Establish MongoDB connection and ensure indexes exist.
@@ -34,30 +82,40 @@ class Animal_Shelter(object):
         COL = collection
         AUTH = auth_source or DB
 
-        self.client = MongoClient(
-            f"mongodb://{USER}:{PASS}@{HOST}:{PORT}/{DB}?authSource={AUTH}"
-        )
+        uri = f"mongodb://{USER}:{PASS}@{HOST}:{PORT}/{DB}?authSource={AUTH}"
+
+        with _CLIENT_CACHE_LOCK:
+            self.client = _CLIENT_CACHE.get(uri)
+            if self.client is None:
+                self.client = MongoClient(
+                    uri,
+                    maxPoolSize=50,
+                    minPoolSize=5,
+                    serverSelectionTimeoutMS=2000,
+                    compressors="zlib"
+                )
+                _CLIENT_CACHE[uri] = self.client
 
         self.database = self.client[DB]
         self.collection = self.database[COL]
+        self._index_key = (HOST, PORT, DB, COL)
 
-        # Ensure indexes on startup
+        # Ensure indexes on startup (the rec_num counter is seeded on first use)
         self.ensure_indexes()
 
 
     def ensure_indexes(self):
         """
         Creates indexes aligned with common dashboard queries.
+        Runs once per process for each host/database/collection.
         """
 
+        if self._index_key in Animal_Shelter._indexes_ensured:
+            return
+
         try:
             self.collection.create_index(
-                [
-                    ("animal_type", ASCENDING),
-                    ("sex_upon_outcome", ASCENDING),
-                    ("age_upon_outcome_in_weeks", ASCENDING),
-                    ("breed", ASCENDING),
-                ],
+                [(field, ASCENDING) for field in RESCUE_FILTER_FIELDS],
                 name="idx_rescue_filters"
             )
 
@@ -66,19 +124,106 @@ class Animal_Shelter(object):
                 name="idx_location"
             )
 
+            # Support breed_counts(): grouping on breed, optionally filtered by type.
+            self.collection.create_index(
+                [("breed", ASCENDING)],
+                name="idx_breed"
+            )
+
+            self.collection.create_index(
+                [("animal_type", ASCENDING), ("breed", ASCENDING)],
+                name="idx_type_breed"
+            )
+
+            # Supports seeding the rec_num counter without a full-collection sort,
+            # and rejects a duplicate rec_num instead of storing it silently.
+            self.collection.create_index(
+                [("rec_num", DESCENDING)],
+                name="idx_rec_num",
+                unique=True,
+                partialFilterExpression={"rec_num": {"$exists": True}}
+            )
+
+            Animal_Shelter._indexes_ensured.add(self._index_key)
+
+        except errors.PyMongoError as e:
+            logger.warning("Could not ensure indexes: %s", e)
+
+
+    def ensure_counters(self):
+        """
+        Seeds the rec_num counter from the current maximum (safe to call repeatedly).
+        Returns True once the counter is known to be seeded.
+        """
+
+        if self._index_key in Animal_Shelter._counters_seeded:
+            return True
+
+        try:
+            doc = self.database.animals.find_one(
+                {"rec_num": {"$exists": True}},
+                {"rec_num": 1, "_id": 0},
+                sort=[("rec_num", DESCENDING)]
+            )
+
+            # $max never moves the counter backwards, so re-seeding is harmless.
+            self.database.counters.update_one(
+                {"_id": REC_NUM_COUNTER_ID},
+                {"$max": {"seq": doc["rec_num"] if doc else 0}},
+                upsert=True
+            )
+
+            Animal_Shelter._counters_seeded.add(self._index_key)
+            return True
+
         except errors.PyMongoError as e:
-            print(f"[WARN] Could not ensure indexes: {e}")
+            logger.warning("Could not ensure counters: %s", e)
+            return False
 
 
     def getNextRecordNum(self):
         """
-        Returns next available rec_num value.
+        Atomically allocates and returns the next rec_num value.
+        """
+
+        return self._reserve_rec_nums(1)
+
+
+    def _reserve_rec_nums(self, count):
+        """
+        Atomically reserves `count` consecutive rec_num values; returns the first.
+        The counter is never created from zero here, so a failed seed cannot
+        hand out rec_num values that already exist.
+        """
+
+        self.ensure_counters()
+
+        counter = self.database.counters.find_one_and_update(
+            {"_id": REC_NUM_COUNTER_ID},
+            {"$inc": {"seq": count}},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if counter is None:
+            raise errors.PyMongoError("rec_num counter has not been seeded")
+
+        return counter["seq"] - count + 1
+
+
+    def _advance_counter(self, rec_num):
+        """
+        Moves the rec_num counter up to an explicitly supplied value so later
+        allocations never hand it out again ($max never moves it backwards).
         """
 
-        out = self.database.animals.find().sort([('rec_num', -1)]).limit(1)
+        if not self.ensure_counters():
+            raise errors.PyMongoError("rec_num counter has not been seeded")
 
-        for doc in out:
-            return doc['rec_num'] + 1
+        self.database.counters.update_one(
+            {"_id": REC_NUM_COUNTER_ID},
+            {"$max": {"seq": rec_num}},
+            upsert=True
+        )
 
 
     # ============================
@@ -87,55 +232,164 @@ class Animal_Shelter(object):
 
     def create(self, data):
         """
-        Inserts a new document.
+        Inserts a new document, allocating rec_num when it is not supplied.
+        A supplied rec_num advances the counter before the insert.
         """
 
         if data is None:
             raise Exception("Nothing to save, data parameter is empty")
 
         try:
-            self.database.animals.insert_one(data)
+            allocated = "rec_num" not in data
+            if allocated:
+                data["rec_num"] = self.getNextRecordNum()
+            else:
+                self._advance_counter(data["rec_num"])
+
+            try:
+                self.database.animals.insert_one(data)
+            except errors.DuplicateKeyError as e:
+                if not allocated or "rec_num" not in (e.details or {}).get("keyPattern", {}):
+                    raise
+                # Another writer stored a higher rec_num after this process seeded;
+                # re-seed from the current maximum and retry once.
+                Animal_Shelter._counters_seeded.discard(self._index_key)
+                data["rec_num"] = self.getNextRecordNum()
+                self.database.animals.insert_one(data)
+
             return True
         except errors.PyMongoError as e:
-            print(f"Insert failed: {e}")
+            logger.warning("Insert failed: %s", e)
             return False
 
 
+    def create_many(self, docs, ordered=False, chunk_size=1000):
+        """
+        Bulk-inserts documents in chunks (one round-trip per chunk).
+        rec_num follows the same rules as create(): documents without one get
+        a value from one reserved block per chunk, and explicit values advance
+        the counter.
+        Returns the _id values of the documents actually inserted.
+        """
+
+        if docs is None:
+            raise Exception("Nothing to save, docs parameter is empty")
+
+        chunk_size = int(chunk_size)
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+
+        inserted = []
+        docs = iter(docs)
+
+        while True:
+            chunk = list(islice(docs, chunk_size))
+            if not chunk:
+                break
+
+            try:
+                explicit = [doc["rec_num"] for doc in chunk if "rec_num" in doc]
+                if explicit:
+                    self._advance_counter(max(explicit))
+
+                missing = [doc for doc in chunk if "rec_num" not in doc]
+                if missing:
+                    first = self._reserve_rec_nums(len(missing))
+                    for offset, doc in enumerate(missing):
+                        doc["rec_num"] = first + offset
+
+                result = self.database.animals.insert_many(chunk, ordered=ordered)
+                inserted.extend(result.inserted_ids)
+
+            except errors.BulkWriteError as e:
+                # insert_many assigns _id in place, so successes can be recovered by index.
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+
+                if ordered:
+                    # Ordered inserts stop at the first error; later chunks are not attempted.
+                    first = min(failed, default=len(chunk))
+                    inserted.extend(doc["_id"] for doc in chunk[:first])
+                    logger.warning("Bulk insert stopped: %d inserted before error: %s", len(inserted), e)
+                    break
+
+                inserted.extend(doc["_id"] for i, doc in enumerate(chunk) if i not in failed)
+                logger.warning("Bulk insert partially failed: %d of %d rejected", len(failed), len(chunk))
+
+            except errors.PyMongoError as e:
+                logger.warning("Bulk insert failed: %s", e)
+                break
+
+        return inserted
+
+
     # ============================
     # READ
     # ============================
 
-    def read(self, query, projection=None, limit=0, skip=0, sort=None):
+    def _find(self, query, projection=None, limit=0, skip=0, sort=None):
         """
-        Reads documents using optional projection, pagination, and sorting.
+        Builds a cursor with projection, pagination, sorting, and batch sizing.
+
+        projection=None uses DEFAULT_PROJECTION for queries on animal_type plus
+        other rescue filter fields only; projection={} returns full documents.
         """
 
         if query is None:
             raise Exception("Query parameter is empty")
 
-        try:
-            cursor = self.collection.find(query, projection)
+        if projection is None:
+            if "animal_type" in query and set(query).issubset(RESCUE_FILTER_FIELDS):
+                projection = DEFAULT_PROJECTION
+        elif not projection:
+            # Explicit request for whole documents (pymongo treats {} as "_id only").
+            projection = None
 
-            if sort:
+        cursor = self.collection.find(query, projection)
+
+        if sort:
+            # Fast path: directions are already pymongo sentinels, pass through as-is.
+            if all(direction in (ASCENDING, DESCENDING) for _, direction in sort):
+                cursor = cursor.sort(sort)
+            else:
                 normalized = [
                     (field, ASCENDING if direction >= 0 else DESCENDING)
                     for field, direction in sort
                 ]
                 cursor = cursor.sort(normalized)
 
-            if skip > 0:
-                cursor = cursor.skip(int(skip))
+        if skip > 0:
+            cursor = cursor.skip(int(skip))
+
+        if limit > 0:
+            cursor = cursor.limit(int(limit))
 
-            if limit > 0:
-                cursor = cursor.limit(int(limit))
+        # Size network batches to the page so a paginated read is one round-trip.
+        batch = min(int(limit), MAX_BATCH_SIZE) if limit > 0 else MAX_BATCH_SIZE
+        return cursor.batch_size(batch)
 
-            return list(cursor)
+
+    def read(self, query, projection=None, limit=0, skip=0, sort=None):
+        """
+        Reads documents using optional projection, pagination, and sorting.
+        """
+
+        try:
+            return list(self._find(query, projection, limit, skip, sort))
 
         except errors.PyMongoError as e:
-            print(f"Read failed: {e}")
+            logger.warning("Read failed: %s", e)
             return []
 
 
+    def iter_read(self, query, projection=None, limit=0, skip=0, sort=None):
+        """
+        Streams documents like read() without building a list.
+        Database errors are raised while iterating.
+        """
+
+        return self._find(query, projection, limit, skip, sort)
+
+
     # ============================
     # UPDATE
     # ============================
@@ -156,7 +410,7 @@ class Animal_Shelter(object):
             return result.modified_count
 
         except errors.PyMongoError as e:
-            print(f"Update failed: {e}")
+            logger.warning("Update failed: %s", e)
             return 0
 
 
@@ -176,7 +430,7 @@ class Animal_Shelter(object):
             result = self.collection.delete_many(lookup_pair)
             return result.deleted_count
         except errors.PyMongoError as e:
-            print(f"Delete failed: {e}")
+            logger.warning("Delete failed: %s", e)
             return 0
 
 
@@ -191,18 +445,30 @@ class Animal_Shelter(object):
 
         query = query or {}
 
+        # Drop missing/null/empty breeds server-side, before grouping.
+        # ($nin with None also matches documents where the field is absent.)
+        has_breed = {"breed": {"$nin": [None, ""]}}
+        if "breed" in query:
+            # Keep the caller's own breed condition alongside the non-null check.
+            match = {"$and": [query, has_breed]}
+        else:
+            match = {**query, **has_breed}
+
         pipeline = [
-            {"$match": query},
+            {"$match": match},
             {"$group": {"_id": "$breed", "count": {"$sum": 1}}},
             {"$sort": {"count": -1}},
             {"$limit": int(limit)}
         ]
 
         try:
-            results = list(self.collection.aggregate(pipeline))
-            return [{"breed": r["_id"], "count": r["count"]} for r in results if r["_id"]]
+            # Build the result directly from the cursor (no intermediate list).
+            return [
+                {"breed": r["_id"], "count": r["count"]}
+                for r in self.collection.aggregate(pipeline)
+            ]
         except errors.PyMongoError as e:
-            print(f"Aggregation failed: {e}")
+            logger.warning("Aggregation failed: %s", e)
             return []
 
 
@@ -214,12 +480,13 @@ class Animal_Shelter(object):
         """
         Returns count of matching documents.
         Used for pagination.
+        An empty query uses collection metadata instead of a full scan.
         """
 
-        query = query or {}
-
         try:
+            if not query:
+                return int(self.collection.estimated_document_count())
             return int(self.collection.count_documents(query))
         except errors.PyMongoError as e:
-            print(f"Count failed: {e}")
+            logger.warning("Count failed: %s", e)
             return 0